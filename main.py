@@ -1,7 +1,34 @@
+from __future__ import annotations
+
 import random
 import sys
+import platform
 import pygame
 import math
+import itertools
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+
+
+def _plain_njit(*args, **kwargs):
+    # stand-in for numba.njit: leaves the kernel as ordinary Python
+    if args and callable(args[0]):
+        return args[0]
+    return lambda fn: fn
+
+
+if platform.python_implementation() == "PyPy":
+    # PyPy's tracing JIT compiles the plain-Python kernels below by itself
+    # and slows down when they go through NumPy, so skip NumPy/Numba there.
+    np = None
+    njit = _plain_njit
+else:
+    import numpy as np
+
+    try:
+        from numba import njit
+    except ImportError:  # numba is optional: kernels still run, just interpreted
+        njit = _plain_njit
 
 # ----------------------------
 # Crossy Road–style mini-clone (difficulty + log hop animation)
@@ -14,16 +41,31 @@ import math
 #   Arrow keys / WASD: move
 #   R: restart after death
 #   Esc: quit
+#
+# Running:
+#   python main.py   (CPython: needs pygame + numpy; numba optional but faster)
+#   pypy3 main.py    (PyPy: needs only pygame; NumPy/Numba paths are skipped)
 
 # ------------ Config ------------
 TILE = 48
 GRID_W = 11
 SCREEN_W = GRID_W * TILE
 SCREEN_H = 14 * TILE
-FPS = 60
+FP_SHIFT = 6  # player x is stored in 1/64-tile fixed-point units
+FP_TILE = 1 << FP_SHIFT
+FP_PER_PX = FP_TILE / TILE
+FPS = 60  # render cap
+SIM_DT = 1.0 / 60.0  # fixed simulation step (s), independent of frame rate
+MAX_SUBSTEPS = 5  # per frame; beyond this, drop time instead of spiralling
 
 START_SAFE_ROWS = 6
 LANE_LOOKAHEAD = 55
+LANE_RING_CAP = LANE_LOOKAHEAD + 60  # > rows kept alive (30 behind .. lookahead ahead); see World.row_limit
+SCREEN_ROWS = SCREEN_H // TILE
+BG_ROWS = SCREEN_ROWS + 3  # rows baked into the cached background
+RAIL_WAKE_ROWS = 3  # rail lanes only tick within this many rows of the screen
+VISIBLE_AHEAD = SCREEN_ROWS + 1  # rows above camera_row that can be on screen
+GEN_BUDGET_PER_STEP = 3  # lookahead lanes generated per update beyond the visible ones
 
 # Base auto-scroll (scaled by difficulty)
 BASE_SCROLL_SPEED = TILE * 0.70  # slower start (was ~1.10)
@@ -45,10 +87,14 @@ LOG_SPAWN_MAX = 1.70
 TRAIN_INTERVAL_MIN = 6.0
 TRAIN_INTERVAL_MAX = 10.0
 TRAIN_WARNING_TIME = 1.1
+TRAIN_W = TILE * 16
 
 # Spacing so obstacles never overlap (px)
 MIN_GAP = TILE * 0.75
 
+# Max live obstacles per lane (a lane is ~21 tiles wide incl. cull margins)
+OBSTACLE_CAPACITY = 16
+
 # Log hop "weight" animation
 LOG_DIP_DURATION = 0.18      # seconds
 LOG_DIP_PIXELS = 7           # max dip amount (px)
@@ -81,7 +127,7 @@ C_DEAD = (250, 90, 90)
 
 
 # ------------ Difficulty ------------
-def difficulty(score: int) -> float:
+def _difficulty_curve(score: int) -> float:
     """
     Returns a multiplier applied to scroll speed, obstacle speeds,
     and spawn frequency (higher = faster and more frequent).
@@ -101,6 +147,19 @@ def difficulty(score: int) -> float:
     return 1.45
 
 
+# The curve is flat from score 80 on, so 81 entries cover every score.
+_DIFF_SIZE = 81
+_DIFF = [_difficulty_curve(i) for i in range(_DIFF_SIZE)]
+_DIFF_LAST = _DIFF[-1]
+
+
+def difficulty(score: int) -> float:
+    """_difficulty_curve(score) via table lookup (score is an int row count)."""
+    if score < 0:
+        return _DIFF[0]
+    return _DIFF[score] if score < _DIFF_SIZE else _DIFF_LAST
+
+
 # ------------ Helpers ------------
 def rect_from_tile(col, row, cam_y):
     """
@@ -114,6 +173,88 @@ def rect_from_tile(col, row, cam_y):
     return pygame.Rect(x, y, TILE, TILE)
 
 
+# ------------ Sprites ------------
+# Pre-rendered surfaces, built once after the display exists (convert()
+# needs a video mode). Blitting these is far cheaper than re-rasterizing
+# rounded rects every frame.
+SPRITES = {}
+BG_STRIPS = {}  # lane type -> full-width background strip
+
+
+def _solid(w, h, color):
+    s = pygame.Surface((w, h))
+    s.fill(color)
+    return s
+
+
+def _with_ties(w, h, color, tie_color):
+    s = _solid(w, h, color)
+    for i in range(0, w, TILE):
+        pygame.draw.rect(s, tie_color, pygame.Rect(i + TILE // 6, h // 2, TILE // 2, TILE // 6))
+    return s
+
+
+def _rounded_sprite(w, h, color, radius):
+    s = pygame.Surface((w, h), pygame.SRCALPHA)
+    pygame.draw.rect(s, color, s.get_rect(), border_radius=radius)
+    return s.convert_alpha()
+
+
+def _log_surface(w_tiles, dip):
+    return _rounded_sprite(w_tiles * TILE, TILE // 2 - max(0, dip // 2), C_LOG, 6)
+
+
+def build_sprites():
+    if SPRITES:
+        return
+    SPRITES["car"] = _rounded_sprite(TILE, TILE * 2 // 3, C_CAR, 8)
+    SPRITES["log2"] = _log_surface(2, 0)
+    SPRITES["log3"] = _log_surface(3, 0)
+    SPRITES["train"] = _rounded_sprite(TRAIN_W, TILE * 3 // 5, C_TRAIN, 4)
+
+    SPRITES["tree"] = _solid(TILE - TILE // 6, TILE - TILE // 6, C_TREE).convert()
+
+    for key, color in (("light", C_WARNING), ("light_red", C_WARNING_RED)):
+        light = pygame.Surface((20, 20), pygame.SRCALPHA)
+        pygame.draw.circle(light, color, (10, 10), 10)
+        SPRITES[key] = light.convert_alpha()
+
+    BG_STRIPS[LANE_GRASS] = _solid(SCREEN_W, TILE, C_GRASS).convert()
+    BG_STRIPS[LANE_ROAD] = _solid(SCREEN_W, TILE, C_ROAD).convert()
+    BG_STRIPS[LANE_RIVER] = _solid(SCREEN_W, TILE, C_RIVER).convert()
+    BG_STRIPS[LANE_RAIL] = _with_ties(SCREEN_W, TILE, C_RAIL, C_RAIL_TIE).convert()
+
+
+def log_sprite(w_tiles, dip):
+    """Log surface for a given width, squashed by the hop dip (cached)."""
+    key = ("log%d" % w_tiles) if dip == 0 else ("log%d" % w_tiles, dip)
+    s = SPRITES.get(key)
+    if s is None:
+        s = SPRITES[key] = _log_surface(w_tiles, dip)
+    return s
+
+
+# ------------ Column bitmasks ------------
+# A lane's columns fit in one int: bit c stands for column c.
+ALL_COLS_MASK = (1 << GRID_W) - 1
+
+
+def corridor_mask(center, half):
+    """Columns center-half .. center+half, clipped to the grid."""
+    lo = max(0, center - half)
+    hi = min(GRID_W - 1, center + half)
+    return ((1 << (hi - lo + 1)) - 1) << lo
+
+
+def random_set_bit(mask, rng):
+    """Column of a uniformly chosen set bit of a non-zero mask."""
+    k = rng.randrange(mask.bit_count())
+    while k:
+        mask &= mask - 1  # drop lowest set bit
+        k -= 1
+    return (mask & -mask).bit_length() - 1
+
+
 # ------------ Lane Types ------------
 LANE_GRASS = "grass"
 LANE_ROAD = "road"
@@ -121,15 +262,122 @@ LANE_RIVER = "river"
 LANE_RAIL = "rail"
 
 
-class Obstacle:
-    def __init__(self, x, w, base_speed, direction):
-        self.x = float(x)
-        self.w = float(w)
-        self.base_speed = float(base_speed)
-        self.dir = int(direction)  # +1 right, -1 left
+def _float_array(n):
+    return [0.0] * n if np is None else np.zeros(n, dtype=np.float32)
+
 
-    def update(self, dt, speed_mult: float):
-        self.x += self.dir * (self.base_speed * speed_mult) * dt
+def _int_array(n, fill=0):
+    return [fill] * n if np is None else np.full(n, fill, dtype=np.int32)
+
+
+def _to_list(a):
+    """Python list of a (slice of an) array made by _float_array/_int_array."""
+    return a if np is None else a.tolist()
+
+
+@dataclass(slots=True)
+class LaneObstacles:
+    """
+    Structure-of-Arrays obstacle storage for one lane.
+    Only the first `count` slots are live; `ids` gives each obstacle a
+    stable, world-unique handle that survives compaction (used for
+    log-hop detection).
+    `x_prev` holds each x as of the previous sim step, for interpolation.
+    Arrays are NumPy on CPython and plain lists on PyPy.
+    """
+    xs: np.ndarray
+    x_prev: np.ndarray
+    ws: np.ndarray
+    dirs: np.ndarray
+    speeds: np.ndarray
+    ids: np.ndarray
+    count: int = 0
+
+    @classmethod
+    def empty(cls, capacity=OBSTACLE_CAPACITY):
+        return cls(
+            xs=_float_array(capacity),
+            x_prev=_float_array(capacity),
+            ws=_float_array(capacity),
+            dirs=_float_array(capacity),
+            speeds=_float_array(capacity),
+            ids=_int_array(capacity),
+        )
+
+    def insert(self, x, w, base_speed, direction, obs_id):
+        """
+        Add an obstacle, keeping xs ascending. Lanes only spawn at their
+        trailing edge, so this is a prepend or an append in practice.
+        """
+        n = self.count
+        if n >= len(self.xs):
+            return
+        i = bisect_left(self.xs, x, 0, n)
+        if i < n:
+            for a in (self.xs, self.x_prev, self.ws, self.dirs, self.speeds, self.ids):
+                a[i + 1:n + 1] = a[i:n]
+        self.xs[i] = x
+        self.x_prev[i] = x
+        self.ws[i] = w
+        self.dirs[i] = direction  # +1 right, -1 left
+        self.speeds[i] = base_speed
+        self.ids[i] = obs_id
+        self.count = n + 1
+        assert all(self.xs[k] <= self.xs[k + 1] for k in range(n)), "lane obstacles out of x order"
+
+
+@njit(cache=True)
+def step_lane(xs, x_prev, ws, dirs, speeds, ids, count, dt, speed_mult, left_bound, right_bound, min_gap):
+    """
+    Advance one lane's obstacles in a single compiled pass:
+    move (remembering the old x in x_prev), cull off-screen entries
+    (compacting in place), then clamp so neighbours never overlap.
+    Returns the new count.
+
+    Expects xs ascending on entry. Every obstacle in a lane shares one
+    direction and speed, so moving and culling never reorder them and
+    no sort is needed.
+    """
+    step = speed_mult * dt
+    n = 0
+    for i in range(count):
+        old = xs[i]
+        x = old + dirs[i] * speeds[i] * step
+        if x + ws[i] > left_bound and x < right_bound:
+            xs[n] = x
+            x_prev[n] = old
+            ws[n] = ws[i]
+            dirs[n] = dirs[i]
+            speeds[n] = speeds[i]
+            ids[n] = ids[i]
+            n += 1
+
+    for i in range(1, n):
+        min_x = xs[i - 1] + ws[i - 1] + min_gap
+        if xs[i] < min_x:
+            xs[i] = min_x
+    return n
+
+
+@njit(cache=True)
+def bin_columns(xs, ws, count, col_to_obs, tile, grid_w):
+    """
+    Fill col_to_obs[c] with the lowest index of an obstacle overlapping
+    grid column c (-1 if none). Obstacles are sorted, at least a tile
+    wide and MIN_GAP apart, so at most the next index can share a column.
+    """
+    for c in range(grid_w):
+        col_to_obs[c] = -1
+    right = grid_w * tile
+    for i in range(count - 1, -1, -1):  # descending so the lowest index wins
+        x0 = xs[i]
+        x1 = x0 + ws[i]
+        if x1 < 0 or x0 > right:
+            continue
+        c0 = max(0, int(x0 // tile))
+        c1 = min(grid_w - 1, int(x1 // tile))
+        for c in range(c0, c1 + 1):
+            col_to_obs[c] = i
 
 
 class Lane:
@@ -147,13 +395,24 @@ class Lane:
     Rail:
       - trains + warning lights (interval scaled by difficulty)
     """
-    def __init__(self, row, lane_type, rng, prev_open_cols=None):
+    # Lane attributes are read every frame for every live lane; slots
+    # make those fixed-offset reads instead of __dict__ lookups.
+    __slots__ = (
+        "row", "type", "rng", "obstacle_ids", "obstacles", "_col_to_obs", "blocked_mask", "direction",
+        "spawn_timer", "base_spawn_interval", "base_speed",
+        "train_timer", "train_warning", "train_active", "train_x", "train_x_prev", "train_dir",
+    )
+
+    def __init__(self, row, lane_type, rng, prev_open_mask=0, obstacle_ids=None):
         self.row = row
         self.type = lane_type
         self.rng = rng
+        # shared with every other lane so ids never collide across rows
+        self.obstacle_ids = obstacle_ids if obstacle_ids is not None else itertools.count()
 
-        self.obstacles = []
-        self.blocked_cols = set()
+        self.obstacles = LaneObstacles.empty()
+        self._col_to_obs = _int_array(GRID_W, -1)  # column -> obstacle index
+        self.blocked_mask = 0  # bit c set => tree in column c
 
         self.direction = rng.choice([-1, 1])
 
@@ -169,10 +428,11 @@ class Lane:
         self.train_warning = 0.0
         self.train_active = False
         self.train_x = 0.0
+        self.train_x_prev = 0.0
         self.train_dir = rng.choice([-1, 1])
 
         if self.type == LANE_GRASS:
-            self._init_grass(prev_open_cols)
+            self._init_grass(prev_open_mask)
         elif self.type == LANE_ROAD:
             self.base_spawn_interval = rng.uniform(CAR_SPAWN_MIN, CAR_SPAWN_MAX)
             self.base_speed = rng.uniform(CAR_SPEED_MIN, CAR_SPEED_MAX)
@@ -186,53 +446,55 @@ class Lane:
             self.train_timer = rng.uniform(TRAIN_INTERVAL_MIN, TRAIN_INTERVAL_MAX)
 
     def is_blocked(self, col):
-        return col in self.blocked_cols
+        return bool(self.blocked_mask & (1 << col))
 
     def open_cols(self):
+        """Bitmask of walkable columns (bit c set => column c open)."""
         if self.type != LANE_GRASS:
-            return set(range(GRID_W))
-        return set(range(GRID_W)) - set(self.blocked_cols)
+            return ALL_COLS_MASK
+        return ALL_COLS_MASK & ~self.blocked_mask
 
     # ----- Grass corridor logic -----
-    def _init_grass(self, prev_open_cols):
+    def _init_grass(self, prev_open_mask):
+        rng = self.rng
+
         # SAFE-ZONE GUARANTEE: never trapped at the beginning
         if self.row < START_SAFE_ROWS:
-            center = GRID_W // 2
-            corridor = {max(0, center - 1), center, min(GRID_W - 1, center + 1)}
+            corridor = corridor_mask(GRID_W // 2, 1)
 
             # very light decoration only, never in corridor
-            target_trees = self.rng.randint(0, 2)
-            candidates = [c for c in range(GRID_W) if c not in corridor]
-            self.rng.shuffle(candidates)
-            for c in candidates[:target_trees]:
-                self.blocked_cols.add(c)
+            target_trees = rng.randint(0, 2)
+            candidates = ALL_COLS_MASK & ~corridor
+            for _ in range(target_trees):
+                c = random_set_bit(candidates, rng)
+                candidates &= ~(1 << c)
+                self.blocked_mask |= 1 << c
             return
 
         # Connected corridor for the rest of the world
-        if prev_open_cols and len(prev_open_cols) > 0:
-            corridor_center = self.rng.choice(sorted(prev_open_cols))
+        if prev_open_mask:
+            corridor_center = random_set_bit(prev_open_mask, rng)
         else:
-            corridor_center = self.rng.randrange(GRID_W)
+            corridor_center = rng.randrange(GRID_W)
 
-        corridor_width = self.rng.choice([2, 3])
-        corridor = set()
-        for dx in range(-(corridor_width // 2), (corridor_width // 2) + 1):
-            corridor.add(max(0, min(GRID_W - 1, corridor_center + dx)))
+        corridor_width = rng.choice([2, 3])
+        corridor = corridor_mask(corridor_center, corridor_width // 2)
 
-        target_trees = self.rng.randint(2, 5)
-        candidates = [c for c in range(GRID_W) if c not in corridor]
-        self.rng.shuffle(candidates)
+        target_trees = rng.randint(2, 5)
+        candidates = ALL_COLS_MASK & ~corridor
 
-        for c in candidates:
-            if len(self.blocked_cols) >= target_trees:
-                break
+        trees = 0
+        while candidates and trees < target_trees:
             # keep at least 3 open columns total
-            if GRID_W - (len(self.blocked_cols) + 1) < 3:
+            if GRID_W - (trees + 1) < 3:
                 break
-            self.blocked_cols.add(c)
+            c = random_set_bit(candidates, rng)
+            candidates &= ~(1 << c)
+            self.blocked_mask |= 1 << c
+            trees += 1
 
         # corridor always open
-        self.blocked_cols -= corridor
+        self.blocked_mask &= ~corridor
 
     # ----- Spawning + spacing -----
     def _edge_spawn_x(self, w):
@@ -242,32 +504,55 @@ class Lane:
             return SCREEN_W + self.rng.uniform(0, TILE * 2)
 
     def _can_spawn_with_gap(self, x, w):
-        if not self.obstacles:
+        obs = self.obstacles
+        n = obs.count
+        if n == 0:
             return True
 
+        # obstacles are x-sorted and never overlap, so the one nearest the
+        # spawn edge is simply the first (moving right) or last (moving left)
         if self.direction == 1:
-            nearest = min(self.obstacles, key=lambda ob: ob.x)
-            return (x + w) <= (nearest.x - MIN_GAP)
+            return (x + w) <= (obs.xs[0] - MIN_GAP)
         else:
-            nearest = max(self.obstacles, key=lambda ob: ob.x + ob.w)
-            return x >= (nearest.x + nearest.w + MIN_GAP)
-
-    def _enforce_no_overlap(self):
-        if len(self.obstacles) <= 1:
-            return
-
-        self.obstacles.sort(key=lambda ob: ob.x)
-        prev = self.obstacles[0]
-        for i in range(1, len(self.obstacles)):
-            cur = self.obstacles[i]
-            min_x = prev.x + prev.w + MIN_GAP
-            if cur.x < min_x:
-                cur.x = min_x
-            prev = cur
+            return x >= (obs.xs[n - 1] + obs.ws[n - 1] + MIN_GAP)
+
+    def _step_obstacles(self, dt, speed_mult: float):
+        # move + cull + no-overlap clamp, all in one compiled kernel
+        obs = self.obstacles
+        if obs.count > 0:
+            margin = TILE * 5
+            obs.count = step_lane(
+                obs.xs, obs.x_prev, obs.ws, obs.dirs, obs.speeds, obs.ids, obs.count,
+                dt, speed_mult, -margin, SCREEN_W + margin, MIN_GAP,
+            )
+            bin_columns(obs.xs, obs.ws, obs.count, self._col_to_obs, TILE, GRID_W)
+
+    def find_obstacle_at(self, x):
+        """
+        Index of the obstacle covering pixel x (inclusive both ends), or -1.
+        Looks up x's column bin, then checks that obstacle and the one
+        after it (the only other one that can reach into the same column).
+        """
+        if x < 0:
+            return -1
+        c = min(int(x // TILE), GRID_W - 1)
+        i = int(self._col_to_obs[c])
+        if i < 0:
+            return -1
+        xs = self.obstacles.xs
+        ws = self.obstacles.ws
+        if xs[i] <= x <= xs[i] + ws[i]:
+            return i
+        i += 1
+        if i < self.obstacles.count and xs[i] <= x <= xs[i] + ws[i]:
+            return i
+        return -1
 
     def _seed_obstacles(self, count):
         for _ in range(count):
             self.spawn_obstacle()
+        obs = self.obstacles
+        bin_columns(obs.xs, obs.ws, obs.count, self._col_to_obs, TILE, GRID_W)
 
     def spawn_obstacle(self):
         if self.type == LANE_ROAD:
@@ -275,7 +560,7 @@ class Lane:
             w = 1 * TILE
             x = self._edge_spawn_x(w)
             if self._can_spawn_with_gap(x, w):
-                self.obstacles.append(Obstacle(x, w, self.base_speed, self.direction))
+                self.obstacles.insert(x, w, self.base_speed, self.direction, next(self.obstacle_ids))
 
         elif self.type == LANE_RIVER:
             # Logs: variable size; fixed speed + spacing prevents overlap/passing
@@ -283,7 +568,7 @@ class Lane:
             w = w_tiles * TILE
             x = self._edge_spawn_x(w)
             if self._can_spawn_with_gap(x, w):
-                self.obstacles.append(Obstacle(x, w, self.base_speed, self.direction))
+                self.obstacles.insert(x, w, self.base_speed, self.direction, next(self.obstacle_ids))
 
     # ----- Train logic -----
     def _roll_next_train_interval(self, diff: float):
@@ -295,6 +580,7 @@ class Lane:
         self.train_active = True
         self.train_warning = 0.0
         self.train_x = (-TILE * 12) if self.train_dir == 1 else (SCREEN_W + TILE * 12)
+        self.train_x_prev = self.train_x
 
     def _finish_train(self, diff: float):
         self.train_active = False
@@ -303,20 +589,13 @@ class Lane:
             self.train_dir *= -1
 
     def update(self, dt, diff: float):
+        lane_type = self.type
+        if lane_type == LANE_GRASS:
+            return  # nothing moves on grass
         speed_mult = diff
 
-        # move obstacles
-        for ob in self.obstacles:
-            ob.update(dt, speed_mult)
-
-        # cull off-screen obstacles
-        margin = TILE * 5
-        left_bound = -margin
-        right_bound = SCREEN_W + margin
-        self.obstacles = [ob for ob in self.obstacles if (ob.x + ob.w) > left_bound and ob.x < right_bound]
-
         # spawn road/river obstacles
-        if self.type in (LANE_ROAD, LANE_RIVER):
+        if lane_type == LANE_ROAD or lane_type == LANE_RIVER:
             # actual interval is longer early, shorter later
             actual_interval = self.base_spawn_interval / diff
 
@@ -324,17 +603,17 @@ class Lane:
             if self.spawn_timer >= actual_interval:
                 self.spawn_timer = 0.0
                 # re-roll a base interval occasionally
-                if self.type == LANE_ROAD:
+                if lane_type == LANE_ROAD:
                     self.base_spawn_interval = self.rng.uniform(CAR_SPAWN_MIN, CAR_SPAWN_MAX)
                 else:
                     self.base_spawn_interval = self.rng.uniform(LOG_SPAWN_MIN, LOG_SPAWN_MAX)
                 self.spawn_obstacle()
 
-            # hard guarantee: no overlap ever
-            self._enforce_no_overlap()
+            # move, cull off-screen, and hard guarantee: no overlap ever
+            self._step_obstacles(dt, speed_mult)
 
         # train logic
-        if self.type == LANE_RAIL:
+        if lane_type == LANE_RAIL:
             if not self.train_active:
                 self.train_timer -= dt
                 if self.train_timer <= TRAIN_WARNING_TIME and self.train_warning <= 0:
@@ -342,6 +621,7 @@ class Lane:
                 if self.train_timer <= 0:
                     self.spawn_train()
             else:
+                self.train_x_prev = self.train_x
                 self.train_x += self.train_dir * (TRAIN_SPEED * diff) * dt
                 if self.train_dir == 1 and self.train_x > SCREEN_W + TILE * 8:
                     self._finish_train(diff)
@@ -353,85 +633,121 @@ class Lane:
                 if self.train_warning < 0:
                     self.train_warning = 0
 
-    def draw(self, surf, cam_y, player=None):
-        y = (SCREEN_H - TILE) - (self.row * TILE - cam_y)
-        if y < -TILE or y > SCREEN_H:
-            return
-
-        if self.type == LANE_GRASS:
-            bg = C_GRASS
-        elif self.type == LANE_ROAD:
-            bg = C_ROAD
-        elif self.type == LANE_RIVER:
-            bg = C_RIVER
-        else:
-            bg = C_RAIL
-
-        pygame.draw.rect(surf, bg, pygame.Rect(0, int(y), SCREEN_W, TILE))
-
-        # rail visuals + warning lights
-        if self.type == LANE_RAIL:
-            for i in range(0, SCREEN_W, TILE):
-                pygame.draw.rect(
-                    surf, C_RAIL_TIE,
-                    pygame.Rect(i + TILE // 6, int(y) + TILE // 2, TILE // 2, TILE // 6)
-                )
-            if self.train_warning > 0:
-                flash = ((pygame.time.get_ticks() // 120) % 2) == 0
-                light_color = C_WARNING_RED if flash else C_WARNING
-                cy = int(y) + TILE // 2
-                pygame.draw.circle(surf, light_color, (18, cy), 10)
-                pygame.draw.circle(surf, light_color, (SCREEN_W - 18, cy), 10)
+    def draw_static(self, yi, blits):
+        """
+        Append the parts of this lane that never change (background strip
+        and trees) to `blits`, with the strip's top at integer y `yi`.
+        World bakes these into its background surface.
+        """
+        # background (rail strip has its ties baked in)
+        blits.append((BG_STRIPS[self.type], (0, yi)))
 
         # trees
         if self.type == LANE_GRASS:
-            for c in self.blocked_cols:
-                r = rect_from_tile(c, self.row, cam_y)
-                pygame.draw.rect(surf, C_TREE, r.inflate(-TILE // 6, -TILE // 6))
+            tree = SPRITES["tree"]
+            inset = TILE // 12
+            tree_y = yi + inset
+            m = self.blocked_mask
+            while m:
+                c = (m & -m).bit_length() - 1
+                m &= m - 1
+                blits.append((tree, (c * TILE + inset, tree_y)))
+
+    def draw(self, yi, blits, player=None, alpha=1.0):
+        """
+        Append this lane's moving sprites to `blits` as (surface, pos) pairs,
+        with the lane's top at integer screen y `yi`; World.draw flushes them
+        with one Surface.blits() call. Positions are interpolated `alpha` of
+        the way from the previous sim step to the current one.
+        Requires build_sprites() (Game does it after set_mode).
+        """
+        lane_type = self.type
+
+        # rail warning lights
+        if lane_type == LANE_RAIL and self.train_warning > 0:
+            flash = ((pygame.time.get_ticks() // 120) % 2) == 0
+            light = SPRITES["light_red" if flash else "light"]
+            top = yi + TILE // 2 - 10
+            blits.append((light, (18 - 10, top)))
+            blits.append((light, (SCREEN_W - 18 - 10, top)))
 
         # cars
-        if self.type == LANE_ROAD:
-            for ob in self.obstacles:
-                r = pygame.Rect(int(ob.x), int(y) + TILE // 6, int(ob.w), TILE * 2 // 3)
-                pygame.draw.rect(surf, C_CAR, r, border_radius=8)
+        obs = self.obstacles
+        n = obs.count
+        if n:
+            draw_xs = [p + (x - p) * alpha for p, x in zip(_to_list(obs.x_prev[:n]), _to_list(obs.xs[:n]))]
+        else:
+            draw_xs = []
+        if lane_type == LANE_ROAD:
+            car = SPRITES["car"]
+            car_y = yi + TILE // 6
+            for x in draw_xs:
+                blits.append((car, (int(x), car_y)))
 
         # logs (with dip animation if player just hopped on)
-        if self.type == LANE_RIVER:
-            for ob in self.obstacles:
-                dip = 0
-                if player is not None and player.log_under is ob and player.log_dip_t > 0:
-                    # smooth "weight" dip: starts big and springs back
-                    t = player.log_dip_t / LOG_DIP_DURATION  # 1 -> 0
-                    # ease-out (more dip at start)
-                    dip = int(LOG_DIP_PIXELS * (t * t))
-
-                r = pygame.Rect(int(ob.x), int(y) + TILE // 4 + dip, int(ob.w), TILE // 2 - max(0, dip // 2))
-                pygame.draw.rect(surf, C_LOG, r, border_radius=6)
+        if lane_type == LANE_RIVER:
+            dip_index = -1
+            dip_amount = 0
+            if player is not None and player.log_dip_t > 0 and player.log_lane_row == self.row:
+                dip_index = player.log_index
+                # smooth "weight" dip: starts big and springs back
+                t = player.log_dip_t / LOG_DIP_DURATION  # 1 -> 0
+                # ease-out (more dip at start)
+                dip_amount = int(LOG_DIP_PIXELS * (t * t))
+
+            log_y = yi + TILE // 4
+            for i, (x, w) in enumerate(zip(draw_xs, _to_list(obs.ws[:n]))):
+                dip = dip_amount if i == dip_index else 0
+                sprite = log_sprite(int(w) // TILE, dip)
+                blits.append((sprite, (int(x), log_y + dip)))
 
         # train
-        if self.type == LANE_RAIL and self.train_active:
-            train_w = TILE * 16
-            r = pygame.Rect(int(self.train_x), int(y) + TILE // 5, train_w, TILE * 3 // 5)
-            pygame.draw.rect(surf, C_TRAIN, r, border_radius=4)
+        if lane_type == LANE_RAIL and self.train_active:
+            train_x = self.train_x_prev + (self.train_x - self.train_x_prev) * alpha
+            blits.append((SPRITES["train"], (int(train_x), yi + TILE // 5)))
 
 
 class World:
     def __init__(self, seed=None):
         self.rng = random.Random(seed)
-        self.lanes = {}
+        self._obstacle_ids = itertools.count()  # one id sequence for all lanes
+        # Ring buffer of lanes: row r lives in slot r % LANE_RING_CAP.
+        # Rows below _base_row have been pruned.
+        self._lanes = [None] * LANE_RING_CAP
+        self._base_row = 0
+        # ascending rows of road/river/rail lanes (the only ones that update)
+        self._active_rows = []
+
+        # Static background (strips + trees) for BG_ROWS rows, topmost row
+        # first; rebuilt only when the camera crosses a row.
+        self._bg = None
+        self._bg_row = None
         self.max_generated_row = -1
 
-        prev_open = set(range(GRID_W))
+        prev_open = ALL_COLS_MASK
         for r in range(START_SAFE_ROWS):
-            self._ensure_lane(r, forced_type=LANE_GRASS, prev_open_cols=prev_open)
-            prev_open = self.lanes[r].open_cols()
+            self._ensure_lane(r, forced_type=LANE_GRASS, prev_open_mask=prev_open)
+            prev_open = self._slot(r).open_cols()
 
         self.max_generated_row = START_SAFE_ROWS - 1
-        self._generate_up_to(START_SAFE_ROWS + LANE_LOOKAHEAD)
+        # only what's on screen now; update() fills the lookahead a few
+        # lanes at a time so neither reset nor scrolling causes a hitch
+        self._generate_up_to(VISIBLE_AHEAD)
+
+    def _slot(self, row):
+        # peek without generating: None if row isn't currently stored
+        lane = self._lanes[row % LANE_RING_CAP]
+        if lane is not None and lane.row == row:
+            return lane
+        return None
 
     def _choose_next_lane_type(self, row):
         # Rail appears about as often as river
-        recent = [self.lanes.get(row - i).type for i in range(1, 4) if (row - i) in self.lanes]
+        recent = []
+        for i in range(1, 4):
+            lane = self._slot(row - i)
+            if lane is not None:
+                recent.append(lane.type)
         river_streak = sum(1 for t in recent if t == LANE_RIVER)
         rail_streak = sum(1 for t in recent if t == LANE_RAIL)
         road_streak = sum(1 for t in recent if t == LANE_ROAD)
@@ -454,64 +770,149 @@ class World:
                 return t
         return LANE_GRASS
 
-    def _ensure_lane(self, row, forced_type=None, prev_open_cols=None):
-        if row in self.lanes:
-            return
+    def _ensure_lane(self, row, forced_type=None, prev_open_mask=0):
+        lane = self._slot(row)
+        if lane is not None:
+            return lane
         lane_type = forced_type if forced_type else self._choose_next_lane_type(row)
-        self.lanes[row] = Lane(row, lane_type, self.rng, prev_open_cols=prev_open_cols)
+        slot = row % LANE_RING_CAP
+        old = self._lanes[slot]
+        assert old is None, f"lane ring overflow: row {row} would evict live row {old.row}"
+        lane = Lane(row, lane_type, self.rng, prev_open_mask=prev_open_mask,
+                    obstacle_ids=self._obstacle_ids)
+        self._lanes[slot] = lane
+        if lane_type != LANE_GRASS:
+            insort(self._active_rows, row)
         self.max_generated_row = max(self.max_generated_row, row)
+        return lane
 
     def _generate_up_to(self, target_row):
         for r in range(self.max_generated_row + 1, target_row + 1):
-            prev_open = self.lanes[r - 1].open_cols() if (r - 1) in self.lanes else set(range(GRID_W))
-            self._ensure_lane(r, prev_open_cols=prev_open)
+            prev = self._slot(r - 1)
+            prev_open = prev.open_cols() if prev is not None else ALL_COLS_MASK
+            self._ensure_lane(r, prev_open_mask=prev_open)
 
     def update(self, dt, camera_row, diff: float):
-        self._generate_up_to(camera_row + LANE_LOOKAHEAD)
+        # visible rows must exist now; the rest of the lookahead is amortized
+        target = camera_row + LANE_LOOKAHEAD
+        budget_to = max(camera_row + VISIBLE_AHEAD, self.max_generated_row + GEN_BUDGET_PER_STEP)
+        self._generate_up_to(min(target, budget_to))
 
         min_row = max(0, camera_row - 10)
         max_row = camera_row + LANE_LOOKAHEAD
-        for r in range(min_row, max_row + 1):
-            lane = self.lanes.get(r)
-            if lane:
-                lane.update(dt, diff)
-
+        # rails far off-screen are dormant: their train timer only runs
+        # once they come within a few rows of the visible window
+        rail_lo = camera_row - RAIL_WAKE_ROWS
+        rail_hi = camera_row + SCREEN_ROWS + RAIL_WAKE_ROWS
+
+        lanes = self._lanes
+        active = self._active_rows
+        for k in range(bisect_left(active, min_row), len(active)):
+            r = active[k]
+            if r > max_row:
+                break
+            lane = lanes[r % LANE_RING_CAP]
+            if lane is None or lane.row != r:
+                continue
+            if lane.type == LANE_RAIL and not (rail_lo <= r <= rail_hi):
+                continue
+            lane.update(dt, diff)
+
+        # prune: clear the slots that just fell behind the window
         prune_before = camera_row - 30
-        for r in [k for k in self.lanes.keys() if k < prune_before]:
-            del self.lanes[r]
+        for r in range(max(self._base_row, prune_before - LANE_RING_CAP), prune_before):
+            if self._slot(r) is not None:
+                lanes[r % LANE_RING_CAP] = None
+        self._base_row = max(self._base_row, prune_before)
+        del active[:bisect_left(active, prune_before)]
 
-    def lane_at(self, row):
-        self._ensure_lane(row, prev_open_cols=None)
-        return self.lanes[row]
+    def row_limit(self):
+        # highest row the ring can hold without evicting a live lane
+        return self._base_row + LANE_RING_CAP - 1
 
-    def draw(self, surf, cam_y, player):
-        top_world_row = (cam_y + (SCREEN_H - TILE)) // TILE + 3
-        bottom_world_row = max(0, cam_y // TILE - 3)
-        for r in range(int(bottom_world_row), int(top_world_row) + 1):
-            lane = self.lanes.get(r)
-            if lane:
-                lane.draw(surf, cam_y, player=player)
+    def lane_at(self, row):
+        # immediate: the player may step past what's been generated so far
+        if row > self.max_generated_row:
+            self._generate_up_to(row)
+        return self._ensure_lane(row)
+
+    def _rebuild_background(self, camera_row):
+        if self._bg is None:
+            self._bg = pygame.Surface((SCREEN_W, BG_ROWS * TILE)).convert()
+        self._bg.fill(C_BG)
+        top_row = camera_row + BG_ROWS - 2
+        blits = []
+        for r in range(max(0, camera_row - 1), top_row + 1):
+            lane = self._slot(r)
+            if lane is not None:
+                lane.draw_static((top_row - r) * TILE, blits)
+        self._bg.blits(blits, doreturn=False)
+        self._bg_row = camera_row
+
+    def background_offset(self, cam_y):
+        """
+        Make sure the cached background covers the rows visible at cam_y.
+        Returns (offset, rebuilt): screen y maps to background y + offset.
+        """
+        cam_px = int(cam_y)
+        camera_row = cam_px // TILE
+        rebuilt = camera_row != self._bg_row
+        if rebuilt:
+            self._rebuild_background(camera_row)
+        top_row = camera_row + BG_ROWS - 2
+        return (top_row + 1) * TILE - SCREEN_H - cam_px, rebuilt
+
+    def draw_background(self, surf, cam_y, rects=None):
+        """Blit the static background, whole screen or only `rects`."""
+        offset, _ = self.background_offset(cam_y)
+        if rects is None:
+            surf.blit(self._bg, (0, 0), pygame.Rect(0, offset, SCREEN_W, SCREEN_H))
+        else:
+            surf.blits([(self._bg, r, r.move(0, offset)) for r in rects], doreturn=False)
+
+    def draw(self, surf, cam_y, player, alpha=1.0):
+        """Draw every moving lane sprite; returns the screen rects touched."""
+        cam_px = int(cam_y)
+        camera_row = cam_px // TILE
+        blits = []
+        for r in range(max(0, camera_row - 1), camera_row + SCREEN_ROWS + 2):
+            lane = self._slot(r)
+            if lane is None:
+                continue
+            y = (SCREEN_H - TILE) - r * TILE + cam_px
+            if -TILE <= y <= SCREEN_H:
+                lane.draw(y, blits, player=player, alpha=alpha)
+        return surf.blits(blits)
 
 
 class Player:
     def __init__(self):
         self.col = GRID_W // 2
         self.row = 1
-        self.x_px = self.col * TILE + TILE / 2  # pixel-precise world x (center)
+        self.x_fp = 0  # world x of the center, in FP_TILE units per tile
+        self.x_sub = 0.0  # carry not yet flushed into x_fp (fp units)
+        self._snap_x_to_col()
 
         self.dead = False
         self.max_row = self.row
 
         # Log riding / animation state
         self.was_on_log = False
-        self.log_under = None
+        self.log_under = None  # id of the log we're riding (LaneObstacles.ids)
+        self.log_index = -1  # its slot in that lane's arrays this frame
+        self.log_lane_row = -1
         self.log_dip_t = 0.0
 
+    @property
+    def x_px(self):
+        return self.x_fp * TILE / FP_TILE
+
     def _sync_col_from_x(self):
-        self.col = int(self.x_px // TILE)
+        self.col = self.x_fp >> FP_SHIFT
 
     def _snap_x_to_col(self):
-        self.x_px = self.col * TILE + TILE / 2
+        self.x_fp = (self.col << FP_SHIFT) + FP_TILE // 2
+        self.x_sub = 0.0
 
     def try_move(self, dcol, drow, world):
         if self.dead:
@@ -524,6 +925,8 @@ class Player:
             return
         if new_row < 0:
             return
+        if new_row > world.row_limit():
+            return
 
         lane = world.lane_at(new_row)
         if lane.type == LANE_GRASS and lane.is_blocked(new_col):
@@ -536,79 +939,88 @@ class Player:
 
     def kill(self):
         self.dead = True
+        # lanes keep compacting after death, so the slot would go stale
+        self.log_index = -1
 
     def update(self, dt, world, cam_y):
         if self.dead:
             return
 
         lane = world.lane_at(self.row)
+        lane_type = lane.type
+        diff = difficulty(self.max_row)  # constant for the whole frame
 
         # decrement dip timer
         if self.log_dip_t > 0:
             self.log_dip_t = max(0.0, self.log_dip_t - dt)
 
         # River: must be on a log; while on log, move with it (preserve offset)
-        if lane.type == LANE_RIVER:
-            on_log = False
-            carry_dx = 0.0
-            log_ref = None
-
-            for ob in lane.obstacles:
-                if ob.x <= self.x_px <= (ob.x + ob.w):
-                    on_log = True
-                    carry_dx = ob.dir * (ob.base_speed * difficulty(self.max_row)) * dt
-                    log_ref = ob
-                    break
-
-            if not on_log:
+        px = self.x_px
+        if lane_type == LANE_RIVER:
+            i = lane.find_obstacle_at(px)
+            if i < 0:
                 self.kill()
                 return
 
+            obs = lane.obstacles
+            carry_dx = float(obs.dirs[i] * obs.speeds[i]) * diff * dt
+            log_ref = int(obs.ids[i])
+
             # Trigger "weight" dip only when you *first* land on a log
-            if (not self.was_on_log) or (self.log_under is not log_ref):
+            if not self.was_on_log or self.log_lane_row != self.row or self.log_under != log_ref:
                 self.log_dip_t = LOG_DIP_DURATION
 
             self.log_under = log_ref
+            self.log_index = i
+            self.log_lane_row = self.row
             self.was_on_log = True
 
-            self.x_px += carry_dx
-            if self.x_px < 0 or self.x_px > SCREEN_W:
+            # flush whole fixed-point units, keep the fraction for next step
+            sub = self.x_sub + carry_dx * FP_PER_PX
+            step = int(sub)
+            self.x_sub = sub - step
+            x_fp = self.x_fp + step
+            self.x_fp = x_fp
+            if x_fp < 0 or x_fp > GRID_W << FP_SHIFT:
                 self.kill()
                 return
             self._sync_col_from_x()
+            px = x_fp * TILE / FP_TILE
 
         else:
             # not river => reset log state
             self.was_on_log = False
             self.log_under = None
+            self.log_index = -1
+            self.log_lane_row = -1
 
         # Road collision
-        if lane.type == LANE_ROAD:
-            for ob in lane.obstacles:
-                if ob.x <= self.x_px <= (ob.x + ob.w):
-                    self.kill()
-                    return
+        if lane_type == LANE_ROAD:
+            if lane.find_obstacle_at(px) >= 0:
+                self.kill()
+                return
 
         # Rail collision
-        if lane.type == LANE_RAIL and lane.train_active:
-            train_w = TILE * 16
-            if lane.train_x <= self.x_px <= (lane.train_x + train_w):
+        if lane_type == LANE_RAIL and lane.train_active:
+            train_x = lane.train_x
+            if train_x <= px <= (train_x + TRAIN_W):
                 self.kill()
                 return
 
-        # Lose if you fall behind (off bottom of screen)
-        pr = rect_from_tile(self.col, self.row, cam_y)
-        if pr.top > SCREEN_H:
+        # Lose if you fall behind (off bottom of screen); same math as
+        # rect_from_tile(...).top without building a Rect every frame
+        if int((SCREEN_H - TILE) - (self.row * TILE - cam_y)) > SCREEN_H:
             self.kill()
 
     def draw(self, surf, cam_y):
+        """Draw the chicken; returns the screen rect it may have touched."""
         t = rect_from_tile(self.col, self.row, cam_y)
         r = t.inflate(-TILE // 6, -TILE // 6)
 
         if self.dead:
             if ((pygame.time.get_ticks() // 120) % 2) == 0:
                 pygame.draw.ellipse(surf, C_DEAD, r)
-            return
+            return t
 
         # Optional tiny hop bounce when log dips
         bounce = 0
@@ -646,6 +1058,7 @@ class Player:
         for sgn in (-1, 1):
             x0 = int(body.centerx + sgn * body.w * 0.18)
             pygame.draw.line(surf, C_BEAK, (x0, foot_y), (x0 + sgn * foot_dx, foot_y), 3)
+        return t  # everything above stays inside the player's tile
 
 
 class Game:
@@ -653,40 +1066,117 @@ class Game:
         pygame.init()
         pygame.display.set_caption("Crossy-Style Hopper (Python/Pygame)")
         self.screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+        build_sprites()
+        # Only queue what run() handles; mouse motion, window chatter, etc.
+        # are dropped by SDL instead of piling up and being drained each frame.
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.VIDEOEXPOSE])
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont(None, 28)
         self.big = pygame.font.SysFont(None, 56)
+        # HUD text is re-rendered only when (score, diff) changes
+        self._ui_key = None
+        self._ui_surf = None
+        # Death screen never changes, so build it once
+        self._overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
+        self._overlay.fill((0, 0, 0, 140))
+        self._msg = self.big.render("SPLAT!", True, C_TEXT)
+        self._msg2 = self.font.render("Press R to restart  •  Esc to quit", True, C_TEXT)
         self.reset()
 
     def reset(self):
         self.world = World(seed=random.randrange(1_000_000))
         self.player = Player()
         self.cam_y = 0.0
+        self.cam_y_prev = 0.0
         self.camera_row = 0
+        self._accum = 0.0  # frame time not yet simulated
+        # Dirty-rect state: rects drawn last frame, or None to force a full redraw
+        self._dirty = None
+        self._last_cam_px = None
 
     def draw_ui(self, diff):
+        """Draw the HUD (and death overlay); returns the score text's rect."""
         score = self.player.max_row
-        txt = self.font.render(f"Score: {score}   Diff: {diff:.2f}", True, C_TEXT)
-        self.screen.blit(txt, (10, 10))
+        key = (score, round(diff, 2))
+        if key != self._ui_key:
+            self._ui_surf = self.font.render(f"Score: {score}   Diff: {diff:.2f}", True, C_TEXT)
+            self._ui_key = key
+        rect = self.screen.blit(self._ui_surf, (10, 10))
 
         if self.player.dead:
-            overlay = pygame.Surface((SCREEN_W, SCREEN_H), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 140))
-            self.screen.blit(overlay, (0, 0))
-            msg = self.big.render("SPLAT!", True, C_TEXT)
-            msg2 = self.font.render("Press R to restart  •  Esc to quit", True, C_TEXT)
+            self.screen.blit(self._overlay, (0, 0))
+            msg = self._msg
+            msg2 = self._msg2
             self.screen.blit(msg, (SCREEN_W // 2 - msg.get_width() // 2, SCREEN_H // 2 - 70))
             self.screen.blit(msg2, (SCREEN_W // 2 - msg2.get_width() // 2, SCREEN_H // 2))
+        return rect
+
+    def step(self, dt):
+        """Advance the simulation by one fixed step."""
+        diff = difficulty(self.player.max_row)
+
+        # Auto-scroll forward (scaled by difficulty)
+        self.cam_y_prev = self.cam_y
+        if not self.player.dead:
+            self.cam_y += (BASE_SCROLL_SPEED * diff) * dt
+
+        self.camera_row = int(self.cam_y // TILE)
+
+        # Update world + player (difficulty-aware)
+        self.world.update(dt, self.camera_row, diff)
+        self.player.update(dt, self.world, self.cam_y)
+
+    def render(self, diff, alpha=1.0):
+        """
+        Draw a frame. When the camera hasn't moved a whole pixel, only the
+        regions drawn last frame are restored from the world's cached
+        background, and only those plus this frame's sprites are pushed to
+        the display. Anything else (scroll, new background, death overlay,
+        first frame) falls back to a full redraw.
+
+        `alpha` is how far we are between the last two sim steps; moving
+        things and the camera are drawn interpolated by it.
+        """
+        screen = self.screen
+        cam_y = self.cam_y_prev + (self.cam_y - self.cam_y_prev) * alpha
+        cam_px = int(cam_y)
+        _, rebuilt = self.world.background_offset(cam_y)
+        partial = (
+            self._dirty is not None
+            and not rebuilt
+            and cam_px == self._last_cam_px
+            and not self.player.dead
+        )
+
+        if partial:
+            self.world.draw_background(screen, cam_y, self._dirty)
+        else:
+            self.world.draw_background(screen, cam_y)
+
+        rects = self.world.draw(screen, cam_y, self.player, alpha)
+        rects.append(self.player.draw(screen, cam_y).clip(screen.get_rect()))
+        rects.append(self.draw_ui(diff))
+
+        if partial:
+            pygame.display.update(self._dirty + rects)
+        else:
+            pygame.display.flip()
+        self._dirty = rects
+        self._last_cam_px = cam_px
 
     def run(self):
         while True:
-            dt = self.clock.tick(FPS) / 1000.0
+            self._accum += self.clock.tick(FPS) / 1000.0
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
 
+                if event.type == pygame.VIDEOEXPOSE:
+                    self._dirty = None  # window contents lost; redraw it all
+
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         pygame.quit()
@@ -705,24 +1195,16 @@ class Game:
                         elif event.key in (pygame.K_DOWN, pygame.K_s):
                             self.player.try_move(0, -1, self.world)
 
-            diff = difficulty(self.player.max_row)
-
-            # Auto-scroll forward (scaled by difficulty)
-            if not self.player.dead:
-                self.cam_y += (BASE_SCROLL_SPEED * diff) * dt
-
-            self.camera_row = int(self.cam_y // TILE)
+            # Fixed-timestep simulation: consume frame time in SIM_DT steps
+            steps = 0
+            while self._accum >= SIM_DT and steps < MAX_SUBSTEPS:
+                self.step(SIM_DT)
+                self._accum -= SIM_DT
+                steps += 1
+            if steps == MAX_SUBSTEPS:
+                self._accum = min(self._accum, SIM_DT)  # hitch: let the backlog go
 
-            # Update world + player (difficulty-aware)
-            self.world.update(dt, self.camera_row, diff)
-            self.player.update(dt, self.world, self.cam_y)
-
-            # Render
-            self.screen.fill(C_BG)
-            self.world.draw(self.screen, self.cam_y, self.player)
-            self.player.draw(self.screen, self.cam_y)
-            self.draw_ui(diff)
-            pygame.display.flip()
+            self.render(difficulty(self.player.max_row), self._accum / SIM_DT)
 
 
 if __name__ == "__main__":